@@ -1,8 +1,6 @@
 from typing import List, Dict, Union, Any
 
 from dask.dataframe import DataFrame
-from pandas import MultiIndex
-
 from framania.pandasmania.aggregate import aggregate_as_series as aggregate_as_series_pandas
 
 
@@ -56,18 +54,12 @@ def flatten_aggregated_columns(dd: DataFrame):
         4    1  400    1
         5  100  500    2
     """
-    if not isinstance(dd.columns, MultiIndex) or dd.columns.nlevels != 2:
+    if getattr(dd.columns, 'nlevels', 1) != 2:
         return dd
 
     result = dd.copy()
 
-    columns = []
-    for l1, l2 in zip(dd.columns.get_level_values(0), dd.columns.get_level_values(1)):
-        if l2 == '':
-            columns.append(l1)
-        else:
-            columns.append('_'.join((l1, l2)))
-    result.columns = columns
+    result.columns = [f'{l1}_{l2}'.removesuffix('_') for l1, l2 in dd.columns.to_flat_index()]
 
     return result
 
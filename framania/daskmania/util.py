@@ -181,12 +181,30 @@ def dataframe_from_series_of_record_dict(series_of_record_dicts: Series,
     return ddf
 
 
-def md5hash(dd: DataFrame) -> hashlib.md5:
+def combine_hashes(partition_hashes, algo: str = 'md5') -> str:
+    """
+    Combine per-partition hex digests into one digest of the whole frame.
+
+    Args:
+        partition_hashes: iterable of hex digest strings, in partition order.
+        algo: hashlib algorithm name.
+    """
+    m = hashlib.new(algo)
+    for v in partition_hashes:
+        m.update(v.encode('utf-8'))
+    return m.hexdigest()
+
+
+def md5hash(dd: DataFrame, algo: str = 'md5', compute: bool = True):
     """
     API to make md5hash from pandas dataframe.
 
     Args:
         pd: pandas dataframe.
+        algo: hashlib algorithm name, applied per partition and to the combined digest.
+        compute: if False, return the uncomputed per-partition digest series instead,
+            so callers can compute it alongside other graphs that share the same data
+            and finish with combine_hashes.
     Examples:
         >>> import dask.dataframe
         >>> import pandas
@@ -206,8 +224,7 @@ def md5hash(dd: DataFrame) -> hashlib.md5:
         >>> md5hash(dd)
         'e650778d6cdca953fad30cccedd4c5f1'
     """
-    results = dd.map_partitions(md5hash_pandas).compute()
-    m = hashlib.md5()
-    for v in results:
-        m.update(v.encode('utf-8'))
-    return m.hexdigest()
+    partition_hashes = dd.map_partitions(md5hash_pandas, algo=algo)
+    if not compute:
+        return partition_hashes
+    return combine_hashes(partition_hashes.compute(), algo)
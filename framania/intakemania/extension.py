@@ -1,4 +1,6 @@
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Any, Union, Dict, Tuple
 
@@ -8,8 +10,10 @@ from intake import DataSource
 from intake.catalog import Catalog
 from intake_parquet import ParquetSource
 
-from framania.daskmania.util import md5hash as ddmd5hash
-from framania.intakemania.util import add_source_to_catalog, initialize_catalog, local_or_s3_path, S3URL
+import dask
+
+from framania.daskmania.util import combine_hashes, md5hash as ddmd5hash
+from framania.intakemania.util import add_source_to_catalog, initialize_catalog, local_or_s3_path, FSSpecURL, S3URL
 
 
 def parse_version(v: Any):
@@ -40,8 +44,32 @@ class FramaniaExtendedIntakeCatalog:
     def __init__(self, intake_catalog_file: Union[Path, S3URL, str]):
         self.intake_catalog = initialize_catalog(intake_catalog_file)
         self.path = intake_catalog_file
+        self._source_cache: Dict[str, 'FramaniaExtendedIntakeSource'] = {}
+        self._analyses: Dict[str, Tuple[List[Any], Any]] = {}
+        self._append_lock = threading.Lock()
+        self._buffered: Optional[List['FramaniaExtendedIntakeSource']] = None
+        self._validate_cache: Optional[Tuple[int, Tuple[bool, Dict]]] = None
+
+    def __enter__(self) -> 'FramaniaExtendedIntakeCatalog':
+        self._buffered = []
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        buffered, self._buffered = self._buffered, None
+        if exc_type is None and buffered:
+            with self._append_lock:
+                for source in buffered:
+                    add_source_to_catalog(source.intake_source, self.path)
+                self.intake_catalog = initialize_catalog(self.path)
+                self._validate_cache = None
+        self._source_cache.clear()
+        return False
 
     def find_by_version_name(self, version_name: str) -> 'FramaniaExtendedIntakeSource':
+        cached = self._source_cache.get(version_name)
+        if cached is not None:
+            return cached
+
         source = self.intake_catalog[version_name]
 
         source_extension = source.metadata.get('extension', None)
@@ -54,7 +82,9 @@ class FramaniaExtendedIntakeCatalog:
 
         upstream_sources = [self.find_validated_by_version_name(s['version_name'], s['md5hash']) for s in
                             source.metadata['upstream']]
-        return FramaniaExtendedIntakeSource(source, name, version, md5hash, upstream_sources, existing_source=True)
+        found = FramaniaExtendedIntakeSource(source, name, version, md5hash, upstream_sources, existing_source=True)
+        self._source_cache[version_name] = found
+        return found
 
     def find_by_version_and_name(self, name: str, version: str) -> 'FramaniaExtendedIntakeSource':
         return self.find_by_version_name(get_version_name(name, version))
@@ -79,6 +109,12 @@ class FramaniaExtendedIntakeCatalog:
 
             versions[source_version] = source_name
 
+        # entries appended inside the context manager are not in the file-backed
+        # catalog yet and only live in the source cache
+        for version_name, cached in self._source_cache.items():
+            if version_name == get_version_name(name, cached.version):
+                versions[cached.version] = version_name
+
         latest_version = list(sorted(versions.keys(), key=lambda v: parse_version(v), reverse=True))[0]
         return self.find_by_version_name(versions[latest_version])
 
@@ -92,31 +128,88 @@ class FramaniaExtendedIntakeCatalog:
             return self.find_latest_source_by_name(item)
 
     def append(self, value: 'FramaniaExtendedIntakeSource'):
-        add_source_to_catalog(value.intake_source, self.path)
-        self.intake_catalog = initialize_catalog(self.path)
+        with self._append_lock:
+            if self._buffered is not None:
+                # inside the context manager: keep the entry in memory and serve
+                # lookups from the source cache until __exit__ flushes the file
+                self._buffered.append(value)
+                self._source_cache[get_version_name(value.name, value.version)] = value
+                return
+            add_source_to_catalog(value.intake_source, self.path)
+            self.intake_catalog = initialize_catalog(self.path)
+            self._source_cache.clear()
+            self._validate_cache = None
+
+    def register_analysis(self, name: str, sources: List[Any], fn: Any):
+        self._analyses[name] = (sources, fn)
+
+    def _analysis_dependencies(self, sources: List[Any]) -> List[str]:
+        names = []
+        for source in sources:
+            if isinstance(source, FramaniaExtendedIntakeSource):
+                dep = source.name
+            else:
+                dep = source
+                if dep not in self._analyses and '_' in dep:
+                    dep = version_and_name(dep)[0]
+            if dep in self._analyses:
+                names.append(dep)
+        return names
+
+    def run_all(self, targets: Optional[List[str]] = None, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        pending = set(targets if targets is not None else self._analyses)
+        stack = list(pending)
+        while stack:
+            for dep in self._analysis_dependencies(self._analyses[stack.pop()][0]):
+                if dep not in pending:
+                    pending.add(dep)
+                    stack.append(dep)
+
+        results: Dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers) as executor:
+            while pending:
+                wave = [name for name in sorted(pending)
+                        if all(dep in results for dep in self._analysis_dependencies(self._analyses[name][0]))]
+                if not wave:
+                    raise Exception(f'Cyclic analysis dependencies among {sorted(pending)}.')
+                futures = {name: executor.submit(self._analyses[name][1]) for name in wave}
+                for name in wave:
+                    results[name] = futures[name].result()
+                    pending.remove(name)
+        return results
+
+    def _catalog_mtime(self) -> Optional[int]:
+        # remote catalogs have no cheap modification time; skip memoization there
+        if isinstance(self.path, FSSpecURL):
+            return None
+        try:
+            return Path(self.path).stat().st_mtime_ns
+        except OSError:
+            return None
 
     def validate(self) -> Tuple[bool, Dict]:
+        mtime = self._catalog_mtime()
+        if mtime is not None and self._validate_cache is not None and self._validate_cache[0] == mtime:
+            return self._validate_cache[1]
+
         result = {}
         result_flag = True
 
-        all_entries = list(self.intake_catalog._entries.keys())
+        pending = [(entry, self.intake_catalog[entry]) for entry in self.intake_catalog._entries.keys()]
+        pending = [(entry, source) for entry, source in pending
+                   if source.metadata.get('extension', '') == 'framania']
 
+        # walk entries upstream-first in waves; entries whose upstream never
+        # resolves (dangling references) are skipped, as before
         finished = set()
-        l_entries = len(all_entries)
-        for i in range(l_entries):
-            for j in range(l_entries):
-                entry = all_entries[j]
-
-                if entry in finished:
-                    continue
-
-                source = self.intake_catalog[entry]
-                if source.metadata.get('extension', '') != 'framania':
-                    continue
-
-                if any([s['version_name'] not in finished for s in source.metadata['upstream']]):
-                    continue
-
+        while pending:
+            ready = [(entry, source) for entry, source in pending
+                     if all(s['version_name'] in finished for s in source.metadata['upstream'])]
+            if not ready:
+                break
+            pending = [(entry, source) for entry, source in pending
+                       if entry not in {e for e, _ in ready}]
+            for entry, source in ready:
                 result[entry] = []
 
                 validate_flag = True
@@ -137,11 +230,14 @@ class FramaniaExtendedIntakeCatalog:
                 result[entry].append((entry, validate_flag))
                 result_flag = result_flag and validate_flag
                 finished.add(entry)
-        return result_flag, result
+        outcome = (result_flag, result)
+        if mtime is not None:
+            self._validate_cache = (mtime, outcome)
+        return outcome
 
     def dump_dask(self, dd: DataFrame, data_name: str, version: str,
                   data_dir: Union[str, Path], upstream_sources: List['FramaniaExtendedIntakeSource'] = None,
-                  **kwargs):
+                  hash_algo: str = 'md5', **kwargs):
         data_dir = local_or_s3_path(data_dir)
 
         parquet_dir = data_dir / data_name / version
@@ -150,12 +246,17 @@ class FramaniaExtendedIntakeCatalog:
         if 'engine' in kwargs:
             parquet_kwargs['engine'] = kwargs['engine']
 
-        to_parquet_result = dd.to_parquet(str(parquet_dir), **kwargs)
+        # run the parquet write and the per-partition hashes in one pass so they
+        # share each partition's materialization without persisting the frame
+        write_graph = dd.to_parquet(str(parquet_dir), compute=False, **kwargs)
+        hash_graph = ddmd5hash(dd, algo=hash_algo, compute=False)
+        to_parquet_result, partition_hashes = dask.compute(write_graph, hash_graph)
 
         psource = ParquetSource(str(parquet_dir), **parquet_kwargs)
-        md5hash = ddmd5hash(psource.to_dask())
+        md5hash = combine_hashes(partition_hashes, hash_algo)
         framania_psource = FramaniaExtendedIntakeSource(psource, data_name, version,
-                                                        md5hash, upstream_sources)
+                                                        md5hash, upstream_sources,
+                                                        metadata={'hash_algo': hash_algo})
         self.append(framania_psource)
 
         return framania_psource, to_parquet_result
@@ -221,7 +322,7 @@ class FramaniaExtendedIntakeSource:
 
 def analysis(name: str, version: str,
              catalog: FramaniaExtendedIntakeCatalog, sources: List[str],
-             data_dir: Path):
+             data_dir: Path, hash_algo: str = 'md5'):
     """
     Examples:
         >>> import pandas
@@ -243,6 +344,8 @@ def analysis(name: str, version: str,
         ...     return test1
         >>> _ = test1()
         >>> _ = test2()
+        >>> sorted(catalog.run_all().keys())
+        ['test1', 'test2']
         >>> os.remove(str(cfile))
         >>> shutil.rmtree(str(ddir))
     """
@@ -250,12 +353,37 @@ def analysis(name: str, version: str,
     def decorator_analysis(func):
         def wrapper(*args, **kwargs) -> Tuple[FramaniaExtendedIntakeSource, Any]:
             upstream_sources = [catalog[source] for source in sources]
+            if not args and not kwargs:
+                # inputs are fully described by the catalog; reuse the stored result
+                # when one was already built from the same upstream content
+                cached = _find_unchanged_result(catalog, name, version, upstream_sources)
+                if cached is not None:
+                    return cached, None
+            # copy() so in-place edits inside one analysis body cannot leak into
+            # another through the dask frame intake caches on the shared source
             input: Dict[str, FramaniaExtendedIntakeSource] = \
-                {source.name: source.intake_source.to_dask() for source in upstream_sources}
+                {source.name: source.intake_source.to_dask().copy() for source in upstream_sources}
             result_dask = func(*args, **kwargs, **input)
-            result_source, dask_job = catalog.dump_dask(result_dask, name, version, data_dir, upstream_sources)
+            result_source, dask_job = catalog.dump_dask(result_dask, name, version, data_dir, upstream_sources,
+                                                         hash_algo=hash_algo)
             return result_source, dask_job
 
+        catalog.register_analysis(name, sources, wrapper)
         return wrapper
 
     return decorator_analysis
+
+
+def _find_unchanged_result(catalog: FramaniaExtendedIntakeCatalog, name: str, version: str,
+                           upstream_sources: List[FramaniaExtendedIntakeSource]) -> Optional[FramaniaExtendedIntakeSource]:
+    try:
+        existing = catalog.find_by_version_and_name(name, version)
+    except Exception:
+        return None
+
+    expected_upstream = [{'version_name': get_version_name(source.name, source.version),
+                          'md5hash': source.md5hash}
+                         for source in upstream_sources]
+    if existing.intake_source.metadata.get('upstream') == expected_upstream:
+        return existing
+    return None
@@ -13,7 +13,22 @@ from intake.catalog.local import YAMLFileCatalog
 from intake_parquet import ParquetSource
 
 
-class S3URL(str):
+class FSSpecURL(str):
+    """
+    pathlib.Path like wrapper for fsspec style urls (memory://, gcs://, ...).
+    """
+
+    def __truediv__(self, other):
+        if not self.endswith('/'):
+            return type(self)(f'{self}/{other}')
+        else:
+            return type(self)(f'{self}{other}')
+
+    def mkdir(self, **kwargs):
+        pass
+
+
+class S3URL(FSSpecURL):
     """
     pathlib.Path like s3 url wrapper class.
     """
@@ -21,24 +36,17 @@ class S3URL(str):
     def __new__(cls, content: str):
         if not content.startswith('s3://'):
             content = f's3://{content}'
-        return str.__new__(cls, content)
-
-    def __truediv__(self, other):
-        if not self.endswith('/'):
-            return S3URL(f'{self}/{other}')
-        else:
-            return S3URL(f'{self}{other}')
+        url = str.__new__(cls, content)
+        parsed = urlparse(url)
+        url._bucket = parsed.netloc
+        url._key = parsed.path.lstrip('/')
+        return url
 
     def bucket(self):
-        parsed = urlparse(self)
-        return parsed.netloc
+        return self._bucket
 
     def key(self):
-        parsed = urlparse(self)
-        return parsed.path.lstrip('/')
-
-    def mkdir(self, **kwargs):
-        pass
+        return self._key
 
 
 def local_or_s3_path(v: Union[str, Path, S3URL]) -> Union[Path, S3URL]:
@@ -57,13 +65,16 @@ def local_or_s3_path(v: Union[str, Path, S3URL]) -> Union[Path, S3URL]:
         >>> assert isinstance(local_or_s3_path(S3URL('abc')), S3URL)
         >>> assert isinstance(local_or_s3_path('abc'), Path)
         >>> assert isinstance(local_or_s3_path('s3://abc'), S3URL)
+        >>> assert isinstance(local_or_s3_path('memory://abc'), FSSpecURL)
     """
     if isinstance(v, Path):
         return v
-    if isinstance(v, S3URL):
+    if isinstance(v, FSSpecURL):
         return v
     if isinstance(v, str) and v.startswith('s3://'):
         return S3URL(v)
+    if isinstance(v, str) and '://' in v:
+        return FSSpecURL(v)
     else:
         return Path(v)
 
@@ -117,7 +128,7 @@ def add_source_to_catalog(source: DataSource, catalog_file: Union[Path, str]):
 
 
 def dump_dask_to_intake(dd: DataFrame, data_name: str, data_dir: Union[str, Path], catalog_file: Union[Path, str],
-                        **kwargs):
+                        consolidate: bool = False, **kwargs):
     """
     API to dump dask dataframe as parquet format and add it to intake catalog
 
@@ -126,6 +137,9 @@ def dump_dask_to_intake(dd: DataFrame, data_name: str, data_dir: Union[str, Path
         data_name: name used as a name of intake data source.
         data_dir: directory where dask dataframe will be stored.
         catalog_file: file where data source to be added. if file doesn't exist, file will be created.
+        consolidate: repartition into ~128MB partitions before writing, so many tiny
+            partitions don't each become their own parquet row group. costs an extra
+            pass over the data to size the partitions, so off by default.
         kwargs: Any options available for dask.dataframe.to_parquet. see https://docs.dask.org/en/latest/dataframe-api.html#dask.dataframe.to_parquet for detail.
     Returns:
         created parquet data source and dask to_parquet job (if you put compute=False in kwargs.)
@@ -199,6 +213,9 @@ def dump_dask_to_intake(dd: DataFrame, data_name: str, data_dir: Union[str, Path
     if 'engine' in kwargs:
         parquet_kwargs['engine'] = kwargs['engine']
 
+    if consolidate and dd.npartitions > 1:
+        dd = dd.repartition(partition_size='128MB')
+
     psource = ParquetSource(str(parquet_dir), **parquet_kwargs)
     psource.name = data_name
     add_source_to_catalog(psource, catalog_file)
@@ -322,6 +339,13 @@ def persist_local(dd: DataFrame, persist_dir: Union[str, Path], **kwargs):
     data_id = str(uuid4())
     persist_dir = local_or_s3_path(persist_dir)
 
+    if isinstance(persist_dir, S3URL):
+        # buffer larger blocks so s3fs issues concurrent multipart uploads
+        # instead of many small serial PUTs
+        storage_options = kwargs.setdefault('storage_options', {})
+        storage_options.setdefault('default_block_size', 64 * 1024 * 1024)
+        kwargs.setdefault('write_metadata_file', False)
+
     persist_dir.mkdir(parents=True, exist_ok=True)
 
     persist_catalog_file = persist_dir / 'persist_catalog.yaml'
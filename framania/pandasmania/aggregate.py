@@ -1,7 +1,8 @@
-from typing import Any
+from typing import Any, Dict, List, Union
 
+import numpy
 import pandas
-from pandas import DataFrame, MultiIndex
+from pandas import DataFrame
 from pandas.core.groupby import GroupBy
 
 
@@ -54,16 +55,11 @@ def flatten_aggregated_columns(pd: DataFrame):
         4    1  400    1
         5  100  500    2
     """
-    if not isinstance(pd.columns, MultiIndex) or pd.columns.nlevels != 2:
+    if getattr(pd.columns, 'nlevels', 1) != 2:
         return pd
 
-    columns = []
-    for l1, l2 in zip(pd.columns.get_level_values(0), pd.columns.get_level_values(1)):
-        if l2 == '':
-            columns.append(l1)
-        else:
-            columns.append('_'.join((l1, l2)))
-    result = pd.set_axis(columns, axis=1, inplace=False)
+    columns = [f'{l1}_{l2}'.removesuffix('_') for l1, l2 in pd.columns.to_flat_index()]
+    result = pd.set_axis(columns, axis=1, copy=False)
     return result
 
 def aggregate_as_series(groupby: GroupBy, series: Any, agg_func: Any):
@@ -106,3 +102,54 @@ def aggregate_as_series(groupby: GroupBy, series: Any, agg_func: Any):
         return new_s
 
     return groupby[series].apply(_series_agg, agg_func=agg_func)
+
+
+def aggregate_as_columns(groupby: GroupBy, agg_spec: Dict[Any, Union[str, List[str]]]) -> DataFrame:
+    """
+    API to output multiple aggregate results as columns aligned with the original data frame.
+    Grouping keys are hashed only once for all requested aggregations,
+    unlike repeated aggregate_as_series calls on the same groupby.
+
+    Args:
+        groupby (GroupBy): result of pandas.DataFrame.groupby
+        agg_spec (Dict[Any, Union[str, List[str]]]): see `func` in https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.DataFrame.agg.html
+    Returns:
+        result pandas dataframe with flat aggregated column names
+    Examples:
+        >>> import pandas
+        >>> pd = pandas.DataFrame({'a': [1, 10, 100, 1, 1, 100], 'b': range(0, 600, 100), 'key': [0, 1, 2, 0, 1, 2]})
+        >>> print(pd)
+        ... # doctest: +NORMALIZE_WHITESPACE
+             a    b  key
+        0    1    0    0
+        1   10  100    1
+        2  100  200    2
+        3    1  300    0
+        4    1  400    1
+        5  100  500    2
+        >>> groupby = pd.groupby(['key', 'a'])
+        >>> result = aggregate_as_columns(groupby, {'b': ['sum', 'mean']})
+        >>> print(result)
+        ... # doctest: +NORMALIZE_WHITESPACE
+           b_sum  b_mean
+        0    300   150.0
+        1    100   100.0
+        2    700   350.0
+        3    300   150.0
+        4    400   400.0
+        5    700   350.0
+    """
+    agg_result = flatten_aggregated_columns(groupby.agg(agg_spec))
+
+    codes, _, _ = groupby.grouper.group_info
+    if len(agg_result) == 0:
+        # every grouping key was NaN: no groups observed, so every row maps to NaN
+        return DataFrame(numpy.nan, index=groupby.obj.index, columns=agg_result.columns)
+    result = agg_result.take(codes)
+    result.index = groupby.obj.index
+
+    na_group = codes == -1
+    if na_group.any():
+        result[na_group] = numpy.nan
+
+    return result
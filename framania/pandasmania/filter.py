@@ -33,8 +33,8 @@ def drop_duplicates_by_named_index_and_keys(pd: DataFrame, subset: List[Any], ke
             idx
             0      1    0
             1     10  100
-            1      1  400
             2    100  200
+            1      1  400
             >>> pd = pandas.DataFrame({'a': [1, 10, 100, 1, 1, 100],
             ...                        'b': range(0, 600, 100),
             ...                        'idx1': [0, 1, 2, 0, 1, 2],
@@ -56,8 +56,9 @@ def drop_duplicates_by_named_index_and_keys(pd: DataFrame, subset: List[Any], ke
             idx1 idx2
             0    1       1    0
             1    1      10  100
-                 1       1  400
             2    1     100  200
+            1    1       1  400
         """
-    index_all_levels = [l for l in range(pd.index.nlevels)]
-    return pd.groupby(level=index_all_levels, group_keys=False).apply(lambda pd: pd.drop_duplicates(subset=subset))
+    keys = pd.reset_index()[list(pd.index.names) + list(subset)]
+    keep_mask = ~keys.duplicated(keep=keep).to_numpy()
+    return pd.iloc[keep_mask]
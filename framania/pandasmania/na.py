@@ -1,5 +1,5 @@
+import numpy
 import pandas
-from framania.pandasmania.transform import grouper_for_timeseries, group_row_number
 
 
 def fbfill_series(ps: pandas.Series, limit=None):
@@ -54,20 +54,32 @@ def fbfill_series(ps: pandas.Series, limit=None):
             7     8.0
             Name: a, dtype: float64
         """
-    ffill_series = ps.fillna(method='ffill', axis=0, inplace=False, limit=limit)
-    bfill_series = ps.fillna(method='bfill', axis=0, inplace=False, limit=limit)
+    v = ps.to_numpy()
+    nan_mask = pandas.isna(v)
+    if not nan_mask.any():
+        return pandas.Series(ps)
 
-    nan_value_flags = ps.isnull() & ~ps.shift(1).isnull()
-    temp_df = pandas.DataFrame({'v': ps, 'na_flag': nan_value_flags}, index=ps.index)
-    temp_df['nan_group'] = grouper_for_timeseries(temp_df.na_flag)
-    temp_df = temp_df[ps.isnull()]
-    temp_df['fnrow'] = group_row_number(temp_df, ['nan_group'], True)
-    temp_df['bnrow'] = group_row_number(temp_df, ['nan_group'], False)
+    n = len(v)
+    idx = numpy.arange(n)
+    fwd = numpy.where(nan_mask, -1, idx)
+    numpy.maximum.accumulate(fwd, out=fwd)
+    bwd = numpy.where(nan_mask, n, idx)
+    bwd = numpy.minimum.accumulate(bwd[::-1])[::-1]
 
-    ffill_index = ps.isnull() & (temp_df.fnrow <= temp_df.bnrow)
-    rfill_index = ps.isnull() & (temp_df.fnrow > temp_df.bnrow)
+    fvalid = fwd >= 0
+    bvalid = bwd < n
+    if limit is not None:
+        fvalid &= idx - fwd - 1 < limit
+        bvalid &= bwd - idx - 1 < limit
 
-    result = pandas.Series(ps)
-    result.loc[ffill_index] = ffill_series.loc[ffill_index]
-    result.loc[rfill_index] = bfill_series.loc[rfill_index]
-    return result
+    # first half of each NaN run (ties included) takes the last valid value,
+    # second half the next one, as before. gather through clipped indices and
+    # mask instead of NaN sentinels, so dtypes without a float NaN (datetime64
+    # and friends) survive; positions whose chosen side has no valid value
+    # keep their original missing marker
+    take_fwd = idx - fwd <= bwd - idx
+    source = numpy.where(take_fwd, numpy.clip(fwd, 0, None), numpy.clip(bwd, None, n - 1))
+    fill = nan_mask & numpy.where(take_fwd, fvalid, bvalid)
+    filled = v.copy()
+    filled[fill] = v[source[fill]]
+    return pandas.Series(filled, index=ps.index, name=ps.name)
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from itertools import chain
 from typing import Any, List
 
 import numpy
@@ -46,15 +47,16 @@ def stack_list_column(pd: DataFrame, list_column: Any, output_dtype: Any, keep_c
 
     ipd = pd.set_index(keep_columns, append=True)
 
-    index = []
-    values = []
-
-    # TODO: more efficient stack implementation if exists
-    for idx, row in ipd[list_column].iteritems():
-        index.extend([idx] * len(row))
-        values.extend(row)
-    ix = pandas.Index(index, names=ipd.index.names)
-    s = pandas.Series(values, dtype=output_dtype, index=ix)
+    col = ipd[list_column]
+    # branch on element lengths: truth-testing the cells would raise for ndarray cells
+    lens = numpy.fromiter(map(len, col.values), dtype=numpy.int64, count=len(col))
+    if (lens > 0).all():
+        s = col.explode().astype(output_dtype)
+    else:
+        # explode would emit a NaN row for each empty list, so keep dropping them here
+        ix = ipd.index.repeat(lens)
+        values = list(chain.from_iterable(col.values))
+        s = pandas.Series(values, dtype=output_dtype, index=ix)
     result = pandas.DataFrame({list_column: s})
     result.reset_index(keep_columns, drop=False, inplace=True)
     return result
@@ -127,22 +129,20 @@ def stack_list_columns(pd: DataFrame, list_columns: List[Any], output_dtypes: Li
         """
     ipd = pd.set_index(keep_columns, append=True)
 
-    index = []
-    values = [[] for _ in list_columns]
+    cols = [ipd[list_column] for list_column in list_columns]
+    lens = numpy.stack([numpy.fromiter(map(len, col.values), dtype=numpy.int64, count=len(col)) for col in cols])
+    max_lens = lens.max(axis=0)
+    total = int(max_lens.sum())
+    ix = ipd.index.repeat(max_lens)
+
+    # position of each output row within its source row, shared by all columns
+    pos_in_row = numpy.arange(total) - numpy.repeat(max_lens.cumsum() - max_lens, max_lens)
 
-    # TODO: more efficient stack implementation if exists
-    for idx, row in ipd.iterrows():
-        list_column_values = [row[list_column] for list_column in list_columns]
-        max_len = max(len(lcv) for lcv in list_column_values)
-        index.extend([idx] * max_len)
-        for vs, _list_column_values in zip(values, list_column_values):
-            vlen = len(_list_column_values)
-            none_values = [numpy.nan] * (max_len - vlen)
-            vs.extend(_list_column_values)
-            vs.extend(none_values)
-        values.extend(row)
-    ix = pandas.Index(index, names=ipd.index.names)
-    series_s = [pandas.Series(vs, dtype=output_dtype, index=ix) for vs, output_dtype in zip(values, output_dtypes)]
+    series_s = []
+    for col, col_lens, output_dtype in zip(cols, lens, output_dtypes):
+        buf = numpy.full(total, numpy.nan, dtype=object)
+        buf[pos_in_row < numpy.repeat(col_lens, max_lens)] = list(chain.from_iterable(col.values))
+        series_s.append(pandas.Series(buf, dtype=output_dtype, index=ix))
     result = pandas.DataFrame(OrderedDict([(list_column, s) for list_column, s in zip(list_columns, series_s)]))
     result.reset_index(keep_columns, drop=False, inplace=True)
     return result
@@ -194,17 +194,18 @@ def stack_dict_column(pd: DataFrame, dict_column: Any, label_dtype: Any, value_d
 
     ipd = pd.set_index(keep_columns, append=True)
 
-    index = []
-    labels = []
-    values = []
+    col = ipd[dict_column]
+    lens = numpy.fromiter(map(len, col.values), dtype=numpy.int64, count=len(col))
+    ix = ipd.index.repeat(lens)
 
-    # TODO: more efficient stack implementation if exists
-    for idx, row in ipd[dict_column].iteritems():
-        index.extend([idx] * len(row))
-        for l, v in row.items():
-            values.append(v)
-            labels.append(l)
-    ix = pandas.Index(index, names=ipd.index.names)
+    total = int(lens.sum())
+    labels = numpy.empty(total, dtype=object)
+    values = numpy.empty(total, dtype=object)
+    offsets = lens.cumsum() - lens
+    for row_offset, row in zip(offsets, col.values):
+        end = row_offset + len(row)
+        labels[row_offset:end] = list(row.keys())
+        values[row_offset:end] = list(row.values())
     ls = pandas.Series(labels, dtype=label_dtype, index=ix)
     vs = pandas.Series(values, dtype=value_dtype, index=ix)
     result = pandas.DataFrame(OrderedDict([(f'{dict_column}{value_suffix}', vs),
@@ -261,13 +262,35 @@ def stack_columns(pd: DataFrame, target_columns: List[Any], keep_columns: List[A
         dtype: object
     """
     indexed = pd.set_index(keep_columns, append=True)
-    stacked = indexed[target_columns].stack()
-    new_index_names = list(stacked.index.names)
-    new_index_names[-1] = label_name
-    renamed = stacked.rename_axis(index=FrozenList(new_index_names))
-    renamed.name = output_name
+    target = indexed[target_columns]
+
+    if len(set(target.dtypes)) == 1:
+        # all targets share a dtype, so the 2-D block can be flattened directly
+        # without stack()'s object-dtype intermediate. pandas usually hands the
+        # block back column-major; make it row-major once so the row-interleaved
+        # reshape below reads memory sequentially instead of striding per element
+        values = target.to_numpy(copy=False)
+        if not values.flags.c_contiguous:
+            values = numpy.ascontiguousarray(values)
+        flat = values.reshape(-1)
+        labels = numpy.tile(numpy.asarray(target_columns, dtype=object), len(indexed))
+        repeated_index = indexed.index.repeat(len(target_columns))
+        # stack() drops NaN cells, so the flattened block has to as well
+        notna = ~pandas.isna(flat)
+        if not notna.all():
+            flat = flat[notna]
+            labels = labels[notna]
+            repeated_index = repeated_index[notna]
+        result_df = DataFrame(OrderedDict([(label_name, labels), (output_name, flat)]),
+                              index=repeated_index).reset_index(level=keep_columns)
+    else:
+        stacked = target.stack()
+        new_index_names = list(stacked.index.names)
+        new_index_names[-1] = label_name
+        renamed = stacked.rename_axis(index=FrozenList(new_index_names))
+        renamed.name = output_name
 
-    result_df = DataFrame(renamed).reset_index(level=keep_columns + [label_name])
+        result_df = DataFrame(renamed).reset_index(level=keep_columns + [label_name])
 
     result_df[label_name] = result_df[label_name].astype(label_dtype)
     result_df[output_name] = result_df[output_name].astype(output_dtype)
@@ -1,9 +1,63 @@
-from typing import List
+import re
+from functools import lru_cache
+from hashlib import sha1
+from struct import unpack_from
+from typing import List, Tuple
 
+import numpy
 import pandas
 from pandas import Series
 
 
+def _prefix_trie_pattern(prefixes: List[str]) -> str:
+    """
+    Compile prefixes into one regex with shared leading characters factored out,
+    so overlapping prefixes are compared at most once per character.
+
+    Examples:
+        >>> print(_prefix_trie_pattern(['abcd', 'abce', 'abcf']))
+        abc(?:d|e|f)
+        >>> print(_prefix_trie_pattern(['ab', 'abc']))
+        ab(?:c)?
+    """
+    trie = {}
+    for prefix in prefixes:
+        node = trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node):
+        matched = '' in node
+        alternatives = [re.escape(char) + emit(child) for char, child in node.items() if char != '']
+        if not alternatives:
+            return ''
+        if len(alternatives) == 1 and not matched:
+            return alternatives[0]
+        pattern = '(?:' + '|'.join(alternatives) + ')'
+        if matched:
+            pattern += '?'
+        return pattern
+
+    return emit(trie)
+
+
+@lru_cache(maxsize=256)
+def _compile_startswith_pattern(startswiths: Tuple[str, ...]):
+    return re.compile(_prefix_trie_pattern(startswiths))
+
+
+@lru_cache(maxsize=256)
+def _compile_endswith_pattern(endswiths: Tuple[str, ...]):
+    # \Z, not $: $ would also match just before a trailing newline
+    return re.compile('(?:' + '|'.join(re.escape(ewith) for ewith in endswiths) + r')\Z')
+
+
+@lru_cache(maxsize=256)
+def _compile_contains_pattern(contains: Tuple[str, ...]):
+    return re.compile('|'.join(f'(?:{c})' for c in contains))
+
+
 def str_startswith_many(ps: Series, startswiths: List[str]):
     """
         API to check string column values start with some of specified string sequences.
@@ -32,9 +86,10 @@ def str_startswith_many(ps: Series, startswiths: List[str]):
             3    False
             dtype: bool
         """
-    result = pandas.Series(False, index=ps.index)
-    for swith in startswiths:
-        result |= ps.str.startswith(swith)
+    if not startswiths:
+        return pandas.Series(False, index=ps.index)
+    result = ps.str.match(_compile_startswith_pattern(tuple(startswiths)), na=False)
+    result.name = None
     return result
 
 
@@ -66,9 +121,10 @@ def str_endswith_many(ps: Series, endswiths: List[str]):
             3     True
             dtype: bool
         """
-    result = pandas.Series(False, index=ps.index)
-    for ewith in endswiths:
-        result |= ps.str.endswith(ewith)
+    if not endswiths:
+        return pandas.Series(False, index=ps.index)
+    result = ps.str.contains(_compile_endswith_pattern(tuple(endswiths)), regex=True, na=False)
+    result.name = None
     return result
 
 
@@ -100,7 +156,42 @@ def str_contains_many(ps: Series, contains: List[str]):
             3     True
             dtype: bool
         """
-    result = pandas.Series(False, index=ps.index)
-    for c in contains:
-        result |= ps.str.contains(c)
+    if not contains:
+        return pandas.Series(False, index=ps.index)
+    result = ps.str.contains(_compile_contains_pattern(tuple(contains)), regex=True, na=False)
+    result.name = None
     return result
+
+
+def str_to_uint64(ps: Series, crypto: bool = False):
+    """
+        API to hash string column values into uint64 codes.
+
+        Args:
+            ps (pandas.Series): target pandas series containing strings
+            crypto (bool): if True, take the code from a SHA-1 digest per value.
+                much slower, but stable for callers that persisted SHA-1 based codes.
+        Returns:
+            uint64 pandas series
+        Examples:
+            >>> import pandas
+            >>> pd = pandas.DataFrame({'a': ['abc', 'bcd', 'abc']})
+            >>> result = str_to_uint64(pd.a)
+            >>> print(result.dtype)
+            uint64
+            >>> print(result[0] == result[2], result[0] == result[1])
+            True False
+            >>> result = str_to_uint64(pd.a, crypto=True)
+            >>> print(result.dtype)
+            uint64
+            >>> print(result[0] == result[2], result[0] == result[1])
+            True False
+        """
+    if not crypto:
+        codes = pandas.util.hash_array(ps.to_numpy(dtype=object), categorize=False)
+        return pandas.Series(codes, index=ps.index, name=ps.name)
+
+    values = ps.values
+    codes = numpy.fromiter((unpack_from('<Q', sha1(s.encode('utf-8')).digest())[0] for s in values),
+                           dtype=numpy.uint64, count=len(values))
+    return pandas.Series(codes, index=ps.index, name=ps.name)
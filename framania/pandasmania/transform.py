@@ -5,6 +5,16 @@ import pandas
 from pandas import Series, DataFrame
 
 
+def _ffill_values(v: numpy.ndarray) -> numpy.ndarray:
+    nan_mask = pandas.isna(v)
+    if not nan_mask.any():
+        return v
+    idx = numpy.arange(len(v))
+    fwd = numpy.where(nan_mask, -1, idx)
+    numpy.maximum.accumulate(fwd, out=fwd)
+    return numpy.where(fwd >= 0, v[numpy.clip(fwd, 0, None)], v)
+
+
 def timeseries_value_changed(value_series: Series, abs_threshold: float=0.0, change_at_nan: bool = True):
     """
     API to check if value of series in sorted timeseries data is changed.
@@ -56,12 +66,17 @@ def timeseries_value_changed(value_series: Series, abs_threshold: float=0.0, cha
     """
 
 
+    v = value_series.to_numpy()
     if change_at_nan is False:
-        value_series = value_series.fillna(method='ffill')
+        v = _ffill_values(v)
 
-    last_value_series = value_series.shift(1)
-    value_changed = ~((value_series - last_value_series).abs() < abs_threshold)
-    return value_changed
+    changed = numpy.empty(len(v), dtype=bool)
+    if len(v):
+        changed[0] = True
+        diff = numpy.abs(v[1:] - v[:-1])
+        numpy.greater_equal(diff, abs_threshold, out=changed[1:])
+        changed[1:] |= numpy.isnan(diff)
+    return Series(changed, index=value_series.index, name=value_series.name)
 
 
 def timeseries_id_changed(id_series: Series, change_at_nan: bool = True):
@@ -114,23 +129,32 @@ def timeseries_id_changed(id_series: Series, change_at_nan: bool = True):
     """
 
 
+    v = id_series.to_numpy()
+    if v.dtype == object:
+        # compare int codes instead of boxed objects; null codes go back to NaN
+        # so they follow the change_at_nan rules like float ids do
+        codes, _ = pandas.factorize(v)
+        v = numpy.where(codes == -1, numpy.nan, codes.astype(numpy.float64))
     if change_at_nan is False:
-        id_series = id_series.fillna(method='ffill')
-
-    last_value_series = id_series.shift(1)
+        v = _ffill_values(v)
 
-    value_changed = id_series != last_value_series
-    return value_changed
+    changed = numpy.empty(len(v), dtype=bool)
+    if len(v):
+        changed[0] = True
+        numpy.not_equal(v[1:], v[:-1], out=changed[1:])
+    return Series(changed, index=id_series.index, name=id_series.name)
 
 
 
-def grouper_for_timeseries(split_flags: Series, start_id: int = 1):
+def grouper_for_timeseries(split_flags: Series, start_id: int = 1, dtype: Any = None):
     """
     API to build grouper id to split timeseries data by some splitting rules.
 
     Args:
         split_flags (pandas.Series[bool]): bool type pandas series, with True value at row where to be split
         start_id (int): start value for incremental grouper id
+        dtype (Any): dtype of grouper ids. default picks int32 when the ids fit,
+            halving the memory traffic of the output column, and int64 otherwise
     Returns:
         result pandas series
     Examples:
@@ -172,13 +196,26 @@ def grouper_for_timeseries(split_flags: Series, start_id: int = 1):
         5    2
         6    3
         7    3
-        dtype: int64
+        dtype: int32
     """
 
-    return split_flags.astype(int).cumsum() + (start_id - 1)
+    v = split_flags.to_numpy()
+    boundaries = numpy.flatnonzero(v)
+    if dtype is None:
+        dtype = numpy.int32 if start_id + len(boundaries) <= numpy.iinfo(numpy.int32).max else numpy.int64
+    if len(boundaries) * 100 <= len(v):
+        # sparse flags: expand run boundaries instead of accumulating over every row
+        counts = numpy.diff(numpy.r_[0, boundaries, len(v)])
+        grouper_ids = numpy.repeat(
+            numpy.arange(start_id - 1, start_id + len(boundaries), dtype=dtype), counts)
+    else:
+        grouper_ids = numpy.cumsum(v, dtype=dtype)
+        if start_id != 1:
+            grouper_ids += start_id - 1
+    return Series(grouper_ids, index=split_flags.index, name=split_flags.name)
 
 
-def group_row_number(pd: DataFrame, groupby: List[Any], ascending: bool=True):
+def group_row_number(pd: DataFrame, groupby: List[Any], ascending: bool=True, assume_sorted: bool=False):
     """
         API to add series that contains numbers of row in each groupby group.
 
@@ -186,6 +223,9 @@ def group_row_number(pd: DataFrame, groupby: List[Any], ascending: bool=True):
             pd (pandas.DataFrame): pandas dataframe which contains groupby columns
             groupby (List[Any]): grouping key. row number will be calculated in each of this groupby
             ascending (bool): if True, row number will starts with 0 and ends with (number of rows - 1). False means opposite
+            assume_sorted (bool): set True when rows with equal keys are already contiguous,
+                like sorted timeseries data. row numbers are then computed from run boundaries
+                without building a groupby at all
         Returns:
             result row number pandas series
         Examples:
@@ -239,24 +279,59 @@ def group_row_number(pd: DataFrame, groupby: List[Any], ascending: bool=True):
             10    0
             11    0
             Name: row_number, dtype: int64
+            >>> result = group_row_number(pd, ['a'], ascending=False, assume_sorted=True)
+            >>> print(result)
+            0     3
+            1     2
+            2     1
+            3     0
+            4     3
+            5     2
+            6     1
+            7     0
+            8     1
+            9     0
+            10    0
+            11    0
+            Name: row_number, dtype: int64
 
         """
-    temp_df = pd[groupby]
-    g = temp_df.groupby(groupby, as_index=False)
+    if assume_sorted:
+        n = len(pd)
+        changed = numpy.zeros(n, dtype=bool)
+        if n:
+            changed[0] = True
+            for column in groupby:
+                v = pd[column].to_numpy()
+                changed[1:] |= v[1:] != v[:-1]
+                na = pandas.isna(v)
+                if na.any():
+                    # a NaN key starts its own size-1 run, matching the groupby path
+                    changed |= na
+                    changed[1:] |= na[:-1]
+        starts = numpy.flatnonzero(changed)
+        sizes = numpy.diff(numpy.r_[starts, n])
+        row_number = numpy.arange(n) - numpy.repeat(starts, sizes)
+        if ascending:
+            return Series(row_number, index=pd.index)
+        return Series(numpy.repeat(sizes, sizes) - row_number - 1, index=pd.index, name='row_number')
+
+    g = pd.groupby(groupby, sort=False, as_index=False)
     row_number = g.cumcount()
+    if row_number.dtype != numpy.int64:
+        # newer pandas drops NaN keys from the groupby; keep them as 0, like size-1 groups
+        row_number = row_number.fillna(0).astype(numpy.int64)
     if ascending:
         return row_number
 
-    temp_df.loc[:, 'row_number'] = row_number
-    row_count = g.count()
-    m_temp_df = temp_df.merge(row_count, on=groupby, how='left')
-    m_temp_df.index = temp_df.index
-
-    m_temp_df['row_number'] = \
-        m_temp_df['row_number_y'].fillna(1).astype(int) - m_temp_df['row_number_x'] - 1
-    return m_temp_df['row_number']
+    codes, _, ngroups = g.grouper.group_info
+    valid = codes >= 0
+    sizes = numpy.bincount(codes[valid], minlength=max(ngroups, 1))
+    # rows with NaN keys form size-1 groups, as the old merge + fillna(1) did
+    group_sizes = numpy.where(valid, sizes[numpy.clip(codes, 0, None)], 1)
+    return Series(group_sizes - row_number.to_numpy() - 1, index=pd.index, name='row_number')
 
-def asstr(ps: pandas.Series, keep_nan: bool = True, remove_dotzero: bool = False):
+def asstr(ps: pandas.Series, keep_nan: bool = True, remove_dotzero: bool = False, arrow: bool = False):
     """
     API to make pandas Series as type string keeping NaN value.
 
@@ -264,6 +339,8 @@ def asstr(ps: pandas.Series, keep_nan: bool = True, remove_dotzero: bool = False
         ps (pandas.Series): target pandas series
         keep_nan (bool): if keep NaN as NaN or make nan as string "nan"
         remove_dotzero (bool): if remove
+        arrow (bool): if True, return pyarrow-backed string dtype instead of object.
+            one contiguous byte buffer instead of boxed str objects, nulls become <NA>
     Returns:
         string type pandas Series
     Examples:
@@ -317,15 +394,60 @@ def asstr(ps: pandas.Series, keep_nan: bool = True, remove_dotzero: bool = False
         10     NaN
         11    4.01
         Name: a, dtype: object
+        >>> result = asstr(pd.a, remove_dotzero=True, arrow=True)
+        >>> print(result)
+        0        1
+        1        1
+        2        1
+        3        1
+        4        2
+        5        2
+        6        2
+        7        2
+        8        3
+        9        3
+        10    <NA>
+        11    4.01
+        Name: a, dtype: string
     """
 
+    if arrow:
+        str_s = ps.astype('string[pyarrow]')
+        if remove_dotzero:
+            dotzero = str_s.str.endswith('.0').fillna(False)
+            str_s = str_s.where(~dotzero, str_s.str.slice(0, -2))
+        if not keep_nan:
+            str_s = str_s.fillna('nan')
+        return str_s
+
     if not keep_nan:
         return ps.astype('str')
 
-    str_s: pandas.Series = ps.astype('str')
-    str_s[ps.isnull()] = numpy.nan
+    na_mask = ps.isnull().to_numpy()
+
+    if remove_dotzero and ps.dtype.kind == 'f':
+        values = ps.to_numpy()[~na_mask]
+        # stay below 1e16: float str() turns scientific at 1e16, and the int
+        # rendering must match what the generic path would have produced
+        if not (values % 1).any() and (numpy.abs(values) < 1e16).all():
+            # every value is integral: render through int64 and skip the suffix pass
+            buffer = numpy.full(len(ps), numpy.nan, dtype=object)
+            buffer[~na_mask] = values.astype(numpy.int64).astype(str)
+            return pandas.Series(buffer, index=ps.index, name=ps.name)
+
+    if na_mask.any():
+        # stringify only the non-null slots instead of patching NaN back afterwards
+        buffer = numpy.full(len(ps), numpy.nan, dtype=object)
+        buffer[~na_mask] = ps.iloc[~na_mask].astype('str').to_numpy()
+        str_s = pandas.Series(buffer, index=ps.index, name=ps.name)
+    else:
+        str_s: pandas.Series = ps.astype('str')
 
     if remove_dotzero:
-        str_s = str_s.str.replace('.0$', '')
+        values = str_s.to_numpy()
+        dotzero = str_s.str.endswith('.0', na=False).to_numpy()
+        if dotzero.any():
+            values[dotzero] = [v[:-2] for v in values[dotzero]]
+            str_s = pandas.Series(values, index=ps.index, name=ps.name)
 
     return str_s
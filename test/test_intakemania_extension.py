@@ -1,25 +1,42 @@
 import os
-import shutil
+import uuid
 from pathlib import Path
 from unittest import TestCase
 
 import dask.dataframe
+import fsspec
+import numpy
 from intake.source.csv import CSVSource
 
 from framania.intakemania.extension import FramaniaExtendedIntakeCatalog, analysis
 
 
 class TestFramaniaExtendedIntake(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # the csv fixtures never change, so convert them to dask frames once for all tests
+        cls.csvsource1 = CSVSource(urlpath='test/data/test-csv1.csv')
+        cls.csvsource2 = CSVSource(urlpath='test/data/test-csv2.csv')
+        cls.csv1_dask = cls.csvsource1.to_dask()
+        cls.csv2_dask = cls.csvsource2.to_dask()
+
     def setUp(self) -> None:
-        self.csvsource1 = CSVSource(urlpath='test/data/test-csv1.csv')
-        self.csvsource2 = CSVSource(urlpath='test/data/test-csv2.csv')
-        self.cpath = Path('test/temp/test-catalog.yaml')
+        # unique per-test paths: no collisions under parallel runs or with doctests
+        self.suffix = uuid.uuid4().hex
+        self.cpath = Path(f'test/temp/test-catalog-{self.suffix}.yaml')
         self.catalog = FramaniaExtendedIntakeCatalog(self.cpath)
-        self.data_dir = Path('test/temp/data-dir')
+        self.data_dir = f'memory://framania-test-{self.suffix}/data-dir'
 
     def tearDown(self) -> None:
         os.remove(str(self.cpath))
-        shutil.rmtree(str(self.data_dir))
+        fsspec.filesystem('memory').rm(f'/framania-test-{self.suffix}', recursive=True)
+
+    def assert_source_metadata(self, source, expected):
+        # intake adds catalog_dir once the entry is read back from the YAML file
+        metadata = {k: v for k, v in source.intake_source.metadata.items() if k != 'catalog_dir'}
+        self.assertEqual(metadata, expected)
+        assert (source.name, source.version, source.md5hash) == \
+               (expected['name'], expected['version'], expected['md5hash'])
 
     def test_initialize(self):
 
@@ -27,100 +44,114 @@ class TestFramaniaExtendedIntake(TestCase):
         def load_raw_csv1(csv_source1):
             return csv_source1
 
-        load_raw_csv1(self.csvsource1.to_dask())
+        load_raw_csv1(self.csv1_dask)
 
         source = self.catalog['raw_csv1_1.0']
-        intake_source = source.intake_source
-        assert intake_source.metadata['extension'] == 'framania'
-        assert intake_source.metadata['version'] == source.version == '1.0'
-        assert intake_source.metadata['version_name'] == 'raw_csv1_1.0'
-        assert intake_source.metadata['name'] == source.name == 'raw_csv1'
-        assert intake_source.metadata['upstream'] == []
-        assert intake_source.metadata['md5hash'] == source.md5hash == '12cd8e064eafadfc8f06af01d31fa8f5'
+        self.assert_source_metadata(source, {'extension': 'framania', 'version': '1.0',
+                                             'version_name': 'raw_csv1_1.0', 'name': 'raw_csv1',
+                                             'upstream': [], 'hash_algo': 'md5',
+                                             'md5hash': '12cd8e064eafadfc8f06af01d31fa8f5'})
 
         assert source.upstream_sources == []
 
     def test_compare(self):
-        @analysis('raw_csv1', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
-        def load_raw_csv1(csv_source1):
-            return csv_source1
+        with self.catalog:
+            @analysis('raw_csv1', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
+            def load_raw_csv1(csv_source1):
+                return csv_source1
 
-        raw_csv1_source, _ = load_raw_csv1(self.csvsource1.to_dask())
+            raw_csv1_source, _ = load_raw_csv1(self.csv1_dask)
 
-        @analysis('raw_csv2', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
-        def load_raw_csv2(csv_source2):
-            return csv_source2
+            @analysis('raw_csv2', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
+            def load_raw_csv2(csv_source2):
+                return csv_source2
 
-        raw_csv2_source, _ = load_raw_csv2(self.csvsource2.to_dask())
+            raw_csv2_source, _ = load_raw_csv2(self.csv2_dask)
 
         assert raw_csv1_source.md5hash != raw_csv2_source.md5hash
 
         source = self.catalog['raw_csv2_1.0']
-        intake_source = source.intake_source
-        assert intake_source.metadata['extension'] == 'framania'
-        assert intake_source.metadata['version'] == source.version == '1.0'
-        assert intake_source.metadata['version_name'] == 'raw_csv2_1.0'
-        assert intake_source.metadata['name'] == source.name == 'raw_csv2'
-        assert intake_source.metadata['upstream'] == []
-        assert intake_source.metadata['md5hash'] == source.md5hash == 'f4466ed4b50c808bfeb64681b4f33dda'
+        self.assert_source_metadata(source, {'extension': 'framania', 'version': '1.0',
+                                             'version_name': 'raw_csv2_1.0', 'name': 'raw_csv2',
+                                             'upstream': [], 'hash_algo': 'md5',
+                                             'md5hash': 'f4466ed4b50c808bfeb64681b4f33dda'})
 
         assert source.upstream_sources == []
 
     def test_dag(self):
-        @analysis('raw_csv1', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
-        def load_raw_csv1(csv_source1):
-            return csv_source1
+        with self.catalog:
+            @analysis('raw_csv1', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
+            def load_raw_csv1(csv_source1):
+                return csv_source1
+
+            raw_csv1_source, _ = load_raw_csv1(self.csv1_dask)
+
+            @analysis('raw_csv2', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
+            def load_raw_csv2(csv_source2):
+                return csv_source2
+
+            raw_csv2_source, _ = load_raw_csv2(self.csv2_dask)
+
+            @analysis('transform_csv1', '1.0', catalog=self.catalog, sources=[raw_csv1_source], data_dir=self.data_dir)
+            def transform_csv1(raw_csv1):
+                def _mul10(df):
+                    numpy.multiply(df['a'].values, 10, out=df['a'].values)
+                    return df
+                return raw_csv1.map_partitions(_mul10, meta=raw_csv1._meta)
+
+            @analysis('transform_csv1_2', '1.0', catalog=self.catalog, sources=[raw_csv1_source, raw_csv2_source],
+                      data_dir=self.data_dir)
+            def transform_csv1_2(raw_csv1, raw_csv2):
+                raw_csv1_rename = raw_csv1.rename(columns={'a': 'a1'})
+                raw_csv2_rename = raw_csv2.rename(columns={'a': 'a2'})
+                # partitions line up pairwise, so no repartition shuffle is needed
+                assert raw_csv1_rename.npartitions == raw_csv2_rename.npartitions
+                return dask.dataframe.concat([raw_csv1_rename[['a1']], raw_csv2_rename[['a2']]], axis=1,
+                                             interleave_partitions=False)
+            transform_csv1()
+            transform_csv1_2()
 
-        raw_csv1_source, _ = load_raw_csv1(self.csvsource1.to_dask())
+        source = self.catalog['transform_csv1_1.0']
+        self.assert_source_metadata(source, {'extension': 'framania', 'version': '1.0',
+                                             'version_name': 'transform_csv1_1.0', 'name': 'transform_csv1',
+                                             'upstream': [{'version_name': 'raw_csv1_1.0',
+                                                           'md5hash': '12cd8e064eafadfc8f06af01d31fa8f5'}],
+                                             'hash_algo': 'md5',
+                                             'md5hash': 'f4466ed4b50c808bfeb64681b4f33dda'})
 
-        @analysis('raw_csv2', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
-        def load_raw_csv2(csv_source2):
-            return csv_source2
+        assert source.upstream_sources == [self.catalog['raw_csv1_1.0']]
 
-        raw_csv2_source, _ = load_raw_csv2(self.csvsource2.to_dask())
+        source = self.catalog['transform_csv1_2_1.0']
+        self.assert_source_metadata(source, {'extension': 'framania', 'version': '1.0',
+                                             'version_name': 'transform_csv1_2_1.0', 'name': 'transform_csv1_2',
+                                             'upstream': [{'version_name': 'raw_csv1_1.0',
+                                                           'md5hash': '12cd8e064eafadfc8f06af01d31fa8f5'},
+                                                          {'version_name': 'raw_csv2_1.0',
+                                                           'md5hash': 'f4466ed4b50c808bfeb64681b4f33dda'}],
+                                             'hash_algo': 'md5',
+                                             'md5hash': '254d056fa3bc963bab43b478d64cd4b2'})
 
-        @analysis('transform_csv1', '1.0', catalog=self.catalog, sources=[raw_csv1_source], data_dir=self.data_dir)
-        def transform_csv1(raw_csv1):
-            raw_csv1['a'] *= 10
-            return raw_csv1
-
-        @analysis('transform_csv1_2', '1.0', catalog=self.catalog, sources=[raw_csv1_source, raw_csv2_source],
-                  data_dir=self.data_dir)
-        def transform_csv1_2(raw_csv1, raw_csv2):
-            raw_csv1_rename = raw_csv1.rename(columns={'a': 'a1'})
-            raw_csv2_rename = raw_csv2.rename(columns={'a': 'a2'})
-            return dask.dataframe.concat([raw_csv1_rename[['a1']], raw_csv2_rename[['a2']]], axis=1,
-                                         interleave_partitions=True)
-        transform_csv1()
+        assert source.upstream_sources == [self.catalog['raw_csv1_1.0'], self.catalog['raw_csv2_1.0']]
 
-        source = self.catalog['transform_csv1_1.0']
-        intake_source = source.intake_source
-        assert intake_source.metadata['extension'] == 'framania'
-        assert intake_source.metadata['version'] == source.version == '1.0'
-        assert intake_source.metadata['version_name'] == 'transform_csv1_1.0'
-        assert intake_source.metadata['name'] == source.name == 'transform_csv1'
-        assert intake_source.metadata['upstream'] == [{'version_name': 'raw_csv1_1.0',
-                                                       'md5hash': '12cd8e064eafadfc8f06af01d31fa8f5'}]
-        assert intake_source.metadata['md5hash'] == source.md5hash == 'f4466ed4b50c808bfeb64681b4f33dda'
+        assert self.catalog.validate()[0]
 
-        assert source.upstream_sources == [self.catalog['raw_csv1_1.0']]
+    def test_dag_by_name(self):
+        # upstream referenced by plain name while the entry is still buffered
+        with self.catalog:
+            @analysis('raw_csv1', '1.0', catalog=self.catalog, sources=[], data_dir=self.data_dir)
+            def load_raw_csv1(csv_source1):
+                return csv_source1
 
-        transform_csv1_2()
+            load_raw_csv1(self.csv1_dask)
 
-        source = self.catalog['transform_csv1_2_1.0']
-        intake_source = source.intake_source
-        assert intake_source.metadata['extension'] == 'framania'
-        assert intake_source.metadata['version'] == source.version == '1.0'
-        assert intake_source.metadata['version_name'] == 'transform_csv1_2_1.0'
-        assert intake_source.metadata['name'] == source.name == 'transform_csv1_2'
-        assert intake_source.metadata['upstream'] == [{'version_name': 'raw_csv1_1.0',
-                                                       'md5hash': '12cd8e064eafadfc8f06af01d31fa8f5'},
-                                                      {'version_name': 'raw_csv2_1.0',
-                                                       'md5hash': 'f4466ed4b50c808bfeb64681b4f33dda'}]
-        assert intake_source.metadata['md5hash'] == source.md5hash == '254d056fa3bc963bab43b478d64cd4b2'
+            @analysis('transform_csv1', '1.0', catalog=self.catalog, sources=['raw_csv1'], data_dir=self.data_dir)
+            def transform_csv1(raw_csv1):
+                return raw_csv1
 
-        assert source.upstream_sources == [self.catalog['raw_csv1_1.0'], self.catalog['raw_csv2_1.0']]
+            transform_csv1()
 
+        source = self.catalog['transform_csv1_1.0']
+        assert source.upstream_sources == [self.catalog['raw_csv1_1.0']]
         assert self.catalog.validate()[0]
 
     def test_validate(self):
@@ -128,26 +159,26 @@ class TestFramaniaExtendedIntake(TestCase):
         def load_raw_csv1(csv_source1):
             return csv_source1
 
-        raw_csv1_source, _ = load_raw_csv1(self.csvsource1.to_dask())
+        raw_csv1_source, _ = load_raw_csv1(self.csv1_dask)
 
         @analysis('transform_csv1', '1.0', catalog=self.catalog, sources=[raw_csv1_source], data_dir=self.data_dir)
         def transform_csv1(raw_csv1):
-            raw_csv1['a'] *= 10
-            return raw_csv1
+            def _mul10(df):
+                numpy.multiply(df['a'].values, 10, out=df['a'].values)
+                return df
+            return raw_csv1.map_partitions(_mul10, meta=raw_csv1._meta)
 
         transform_csv1()
 
         source = self.catalog['transform_csv1_1.0']
-        intake_source = source.intake_source
-        assert intake_source.metadata['extension'] == 'framania'
-        assert intake_source.metadata['version'] == source.version == '1.0'
-        assert intake_source.metadata['version_name'] == 'transform_csv1_1.0'
-        assert intake_source.metadata['name'] == source.name == 'transform_csv1'
-        assert intake_source.metadata['upstream'] == [{'version_name': 'raw_csv1_1.0',
-                                                       'md5hash': '12cd8e064eafadfc8f06af01d31fa8f5'}]
-        assert intake_source.metadata['md5hash'] == source.md5hash == 'f4466ed4b50c808bfeb64681b4f33dda'
+        self.assert_source_metadata(source, {'extension': 'framania', 'version': '1.0',
+                                             'version_name': 'transform_csv1_1.0', 'name': 'transform_csv1',
+                                             'upstream': [{'version_name': 'raw_csv1_1.0',
+                                                           'md5hash': '12cd8e064eafadfc8f06af01d31fa8f5'}],
+                                             'hash_algo': 'md5',
+                                             'md5hash': 'f4466ed4b50c808bfeb64681b4f33dda'})
 
         assert source.upstream_sources == [self.catalog['raw_csv1_1.0']]
 
-        raw_csv1_source, _ = load_raw_csv1(self.csvsource2.to_dask())
+        raw_csv1_source, _ = load_raw_csv1(self.csv2_dask)
         assert not self.catalog.validate()[0]